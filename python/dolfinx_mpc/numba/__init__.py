@@ -3,7 +3,13 @@
 # This file is part of DOLFINX_MPC
 #
 # SPDX-License-Identifier:    MIT
-"""Numba extension for dolfinx_mpc"""
+"""Numba extension for dolfinx_mpc
+
+The default assemblers, :func:`dolfinx_mpc.assemble_matrix` and
+:func:`dolfinx_mpc.assemble_vector`, are implemented in C++. The assemblers in
+this module are Python reference implementations, and are slower as they
+re-assemble every cell containing a slave degree of freedom through a Numba kernel.
+"""
 
 # flake8: noqa
 from __future__ import annotations
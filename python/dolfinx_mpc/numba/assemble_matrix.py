@@ -21,7 +21,14 @@ import numba
 from dolfinx_mpc.assemble_matrix import create_sparsity_pattern
 from dolfinx_mpc.multipointconstraint import MultiPointConstraint
 
-from .helpers import _bcs, _forms, extract_slave_cells, pack_slave_facet_info
+from .helpers import (
+    _bcs,
+    _forms,
+    _tabulate_tensor,
+    compute_local_slave_index,
+    pack_slave_facet_info,
+    slave_cell_indicator,
+)
 from .numba_setup import initialize_petsc, sink
 
 mode = _PETSc.InsertMode.ADD_VALUES  # type: ignore
@@ -61,6 +68,7 @@ def assemble_matrix(
     cell_to_slave = c_to_s_adj.array
     c_to_s_off = c_to_s_adj.offsets
     is_slave = constraint.is_slave
+    local_slave_index = compute_local_slave_index(cell_to_slave, c_to_s_off, dofs, dofmap.index_map_bs)
     mpc_data = (
         masters_adj.array,
         coefficients,
@@ -68,8 +76,10 @@ def assemble_matrix(
         cell_to_slave,
         c_to_s_off,
         is_slave,
+        local_slave_index,
     )
-    slave_cells = extract_slave_cells(c_to_s_off)
+    cell_map = V.mesh.topology.index_map(V.mesh.topology.dim)
+    is_slave_cell = slave_cell_indicator(c_to_s_off, cell_map.size_local + cell_map.num_ghosts)
 
     # Create 1D bc indicator for matrix assembly
     num_dofs_local = (dofmap.index_map.size_local + dofmap.index_map.num_ghosts) * dofmap.index_map_bs
@@ -122,31 +132,19 @@ def assemble_matrix(
     if e0.needs_dof_transformations or e1.needs_dof_transformations:
         raise NotImplementedError("Dof transformations not implemented")
 
-    if _PETSc.ScalarType == numpy.float32:  # type: ignore
-        nptype = "float32"
-    elif _PETSc.ScalarType == numpy.float64:  # type: ignore
-        nptype = "float64"
-    elif _PETSc.ScalarType == numpy.complex64:  # type: ignore
-        nptype = "complex64"
-    elif _PETSc.ScalarType == numpy.complex128:  # type: ignore
-        nptype = "complex128"
-    else:
-        raise RuntimeError(f"Unsupported scalar type {_PETSc.ScalarType}.")  # type: ignore
-
     ufcx_form = form.ufcx_form
     if num_cell_integrals > 0:
         # NOTE: This depends on enum ordering in ufcx.h
         cell_form_pos = ufcx_form.form_integral_offsets[0]
-        V.mesh.topology.create_entity_permutations()
         for i, id in enumerate(subdomain_ids):
             coeffs_i = form_coeffs[(_fem.IntegralType.cell, id)]
 
-            cell_kernel = getattr(ufcx_form.form_integrals[cell_form_pos + i], f"tabulate_tensor_{nptype}")
+            cell_kernel = getattr(ufcx_form.form_integrals[cell_form_pos + i], _tabulate_tensor)
             active_cells = form._cpp_object.domains(_fem.IntegralType.cell, id)
             assemble_slave_cells(
                 A.handle,
                 cell_kernel,
-                active_cells[numpy.isin(active_cells, slave_cells)],
+                active_cells[is_slave_cell[active_cells]],
                 (x_dofs, x),
                 coeffs_i,
                 form_consts,
@@ -172,14 +170,14 @@ def assemble_matrix(
         if form._cpp_object.needs_facet_permutations:
             facet_perms = V.mesh.topology.get_facet_permutations()
         perm = (cell_perms, form._cpp_object.needs_facet_permutations, facet_perms)
+        num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
         # NOTE: This depends on enum ordering in ufcx.h
         ext_facet_pos = ufcx_form.form_integral_offsets[1]
         for i, id in enumerate(subdomain_ids):
-            facet_kernel = getattr(ufcx_form.form_integrals[ext_facet_pos + i], f"tabulate_tensor_{nptype}")
+            facet_kernel = getattr(ufcx_form.form_integrals[ext_facet_pos + i], _tabulate_tensor)
             facets = form._cpp_object.domains(_fem.IntegralType.exterior_facet, id)
             coeffs_i = form_coeffs[(_fem.IntegralType.exterior_facet, id)]
-            facet_info = pack_slave_facet_info(facets, slave_cells)
-            num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
+            facet_info = pack_slave_facet_info(facets, is_slave_cell)
             assemble_exterior_slave_facets(
                 A.handle,
                 facet_kernel,
@@ -247,6 +245,7 @@ def assemble_slave_cells(
         numba.int32[:],
         numba.int32[:],
         numba.int32[:],
+        numba.int32[:],
     ],
     is_bc: numba.bool_[:],
 ):
@@ -269,7 +268,7 @@ def assemble_slave_cells(
         (block_size * num_dofs_per_element, block_size * num_dofs_per_element),
         dtype=_PETSc.ScalarType,  # type: ignore
     )
-    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave = mpc
+    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave, local_slave_index = mpc
 
     # Loop over all cells
     local_dofs = numpy.zeros(block_size * num_dofs_per_element, dtype=numpy.int32)
@@ -303,7 +302,8 @@ def assemble_slave_cells(
 
         # Find local position of slaves
         slaves = c_to_s[c_to_s_off[cell] : c_to_s_off[cell + 1]]
-        mpc_cell = (slaves, masters, coefficients, offsets, is_slave)
+        local_index = local_slave_index[c_to_s_off[cell] : c_to_s_off[cell + 1]]
+        mpc_cell = (slaves, local_index, masters, coefficients, offsets, is_slave)
         modify_mpc_cell(A, num_dofs_per_element, block_size, A_local, local_blocks, mpc_cell)
 
         # Remove already assembled contribution to matrix
@@ -337,6 +337,7 @@ def modify_mpc_cell(
     Ae: Union[numba.float32[:, :], numba.float64[:, :], numba.complex128[:, :], numba.complex64[:, :]],
     local_blocks: numba.int32[:],
     mpc_cell: Tuple[  # type: ignore
+        numba.int32[:],
         numba.int32[:],
         numba.int32[:],
         Union[numba.float32[:], numba.float64[:], numba.complex64[:], numba.complex128[:]],
@@ -348,19 +349,12 @@ def modify_mpc_cell(
     Given an element matrix Ae, modify the contributions to respect the MPCs, and add contributions to appropriate
     places in the global matrix A.
     """
-    slaves, masters, coefficients, offsets, is_slave = mpc_cell
+    slaves, local_index0, masters, coefficients, offsets, is_slave = mpc_cell
 
-    # Locate which local dofs are slave dofs and compute the local index of the slave
-    # Additionally count the number of masters we will needed in the flattened structures
-    local_index0 = numpy.empty(len(slaves), dtype=numpy.int32)
+    # Count the number of masters we will needed in the flattened structures
     num_flattened_masters = 0
-    for i in range(num_dofs):
-        for j in range(block_size):
-            slave = local_blocks[i] * block_size + j
-            if is_slave[slave]:
-                location = numpy.flatnonzero(slaves == slave)[0]
-                local_index0[location] = i * block_size + j
-                num_flattened_masters += offsets[slave + 1] - offsets[slave]
+    for slave in slaves:
+        num_flattened_masters += offsets[slave + 1] - offsets[slave]
     # Strip a copy of Ae of all columns and rows belonging to a slave
     Ae_original = numpy.copy(Ae)
     Ae_stripped = numpy.zeros((block_size * num_dofs, block_size * num_dofs), dtype=_PETSc.ScalarType)  # type: ignore
@@ -392,6 +386,13 @@ def modify_mpc_cell(
     Arow = numpy.zeros(block_size * num_dofs, dtype=_PETSc.ScalarType)  # type: ignore
     Acol = numpy.zeros(block_size * num_dofs, dtype=_PETSc.ScalarType)  # type: ignore
     mpc_dofs = numpy.zeros(block_size * num_dofs, dtype=numpy.int32)
+
+    # Expand local blocks to dofs once, as it is the same for every master
+    cell_dofs = numpy.empty(block_size * num_dofs, dtype=numpy.int32)
+    for j in range(num_dofs):
+        for k in range(block_size):
+            cell_dofs[j * block_size + k] = local_blocks[j] * block_size + k
+
     ffi_fb = ffi.from_buffer
     for i in range(num_flattened_masters):
         local_index = flattened_slaves[i]
@@ -403,9 +404,7 @@ def modify_mpc_cell(
         Arow[:] = coeff * Ae_stripped[:, local_index]
         Acol[:] = coeff * Ae_stripped[local_index, :]
         Am0m1[0, 0] = coeff**2 * Ae_original[local_index, local_index]
-        for j in range(num_dofs):
-            for k in range(block_size):
-                mpc_dofs[j * block_size + k] = local_blocks[j] * block_size + k
+        mpc_dofs[:] = cell_dofs
         mpc_dofs[local_index] = master
         ierr_row = set_values_local(
             A,
@@ -467,13 +466,14 @@ def assemble_exterior_slave_facets(
         numba.int32[:],
         numba.int32[:],
         numba.int32[:],
+        numba.int32[:],
     ],
     is_bc: npt.NDArray[numpy.bool_],
     num_facets_per_cell: int,
 ):
     """Assemble MPC contributions over exterior facet integrals"""
     # Unpack mpc data
-    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave = mpc
+    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave, local_slave_index = mpc
 
     # Mesh data
     x_dofmap, x = mesh
@@ -529,7 +529,8 @@ def assemble_exterior_slave_facets(
 
         A_local_copy: numpy.typing.NDArray[_PETSc.ScalarType] = A_local.copy()  # type: ignore
         slaves = c_to_s[c_to_s_off[cell_index] : c_to_s_off[cell_index + 1]]
-        mpc_cell = (slaves, masters, coefficients, offsets, is_slave)
+        local_index = local_slave_index[c_to_s_off[cell_index] : c_to_s_off[cell_index + 1]]
+        mpc_cell = (slaves, local_index, masters, coefficients, offsets, is_slave)
         modify_mpc_cell(A, num_dofs_per_element, block_size, A_local, local_blocks, mpc_cell)
 
         # Remove already assembled contribution to matrix
@@ -22,8 +22,8 @@ from dolfinx.la.petsc import create_vector
 import numba
 from dolfinx_mpc.multipointconstraint import MultiPointConstraint
 
-from .helpers import _forms, extract_slave_cells, pack_slave_facet_info
-from .numba_setup import initialize_petsc
+from .helpers import _forms, _tabulate_tensor, compute_local_slave_index, pack_slave_facet_info, slave_cell_indicator
+from .numba_setup import initialize_petsc, sink
 
 ffi, _ = initialize_petsc()
 
@@ -54,16 +54,18 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     c_to_s_adj = constraint.cell_to_slaves
     cell_to_slave = c_to_s_adj.array
     c_to_s_off = c_to_s_adj.offsets
-    is_slave = constraint.is_slave
+    local_slave_index = compute_local_slave_index(cell_to_slave, c_to_s_off, dofs, block_size)
     mpc_data = (
         masters_adj.array,
         coefficients,
         masters_adj.offsets,
         cell_to_slave,
         c_to_s_off,
-        is_slave,
+        local_slave_index,
     )
-    slave_cells = extract_slave_cells(c_to_s_off)
+    tdim = V.mesh.topology.dim
+    cell_map = V.mesh.topology.index_map(tdim)
+    is_slave_cell = slave_cell_indicator(c_to_s_off, cell_map.size_local + cell_map.num_ghosts)
 
     # Get index map and ghost info
     if b is None:
@@ -76,13 +78,8 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     form_coeffs = _cpp.fem.pack_coefficients(form._cpp_object)
     form_consts = _cpp.fem.pack_constants(form._cpp_object)
 
-    tdim = V.mesh.topology.dim
     num_dofs_per_element = V.dofmap.dof_layout.num_dofs
 
-    # Assemble vector with all entries
-    with vector.localForm() as b_local:
-        _cpp.fem.assemble_vector(b_local.array_w, form._cpp_object, form_consts, form_coeffs)
-
     # Check if we need facet permutations
     # FIXME: access apply_dof_transformations here
     e0 = form.function_spaces[0].element
@@ -97,70 +94,61 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     subdomain_ids = form._cpp_object.integral_ids(_fem.IntegralType.cell)
     num_cell_integrals = len(subdomain_ids)
 
-    if _PETSc.ScalarType == numpy.float32:  # type: ignore
-        nptype = "float32"
-    elif _PETSc.ScalarType == numpy.float64:  # type: ignore
-        nptype = "float64"
-    elif _PETSc.ScalarType == numpy.complex64:  # type: ignore
-        nptype = "complex64"
-    elif _PETSc.ScalarType == numpy.complex128:  # type: ignore
-        nptype = "complex128"
-    else:
-        raise RuntimeError(f"Unsupported scalar type {_PETSc.ScalarType}.")  # type: ignore
     ufcx_form = form.ufcx_form
-    if num_cell_integrals > 0:
-        V.mesh.topology.create_entity_permutations()
 
-        # NOTE: This depends on enum ordering in ufcx.h
-        cell_form_pos = ufcx_form.form_integral_offsets[0]
-        for i, id in enumerate(subdomain_ids):
-            cell_kernel = getattr(ufcx_form.form_integrals[cell_form_pos + i], f"tabulate_tensor_{nptype}")
-            active_cells = form._cpp_object.domains(_fem.IntegralType.cell, id)
-            coeffs_i = form_coeffs[(_fem.IntegralType.cell, id)]
-            with vector.localForm() as b:
+    # Assemble vector with all entries, then add the MPC contributions
+    # of all integrals into the same local array
+    with vector.localForm() as b_local:
+        b = b_local.array_w
+        _cpp.fem.assemble_vector(b, form._cpp_object, form_consts, form_coeffs)
+
+        # Assemble cell integrals
+        if num_cell_integrals > 0:
+            # NOTE: This depends on enum ordering in ufcx.h
+            cell_form_pos = ufcx_form.form_integral_offsets[0]
+            for i, id in enumerate(subdomain_ids):
+                cell_kernel = getattr(ufcx_form.form_integrals[cell_form_pos + i], _tabulate_tensor)
+                active_cells = form._cpp_object.domains(_fem.IntegralType.cell, id)
+                coeffs_i = form_coeffs[(_fem.IntegralType.cell, id)]
                 assemble_cells(
-                    numpy.asarray(b),
+                    b,
                     cell_kernel,
-                    active_cells[numpy.isin(active_cells, slave_cells)],
+                    active_cells[is_slave_cell[active_cells]],
                     (x_dofs, x),
                     coeffs_i,
                     form_consts,
-                    cell_perms,
-                    dofs,
                     block_size,
                     num_dofs_per_element,
                     mpc_data,
                 )
 
-    # Assemble exterior facet integrals
-    subdomain_ids = form._cpp_object.integral_ids(_fem.IntegralType.exterior_facet)
-    num_exterior_integrals = len(subdomain_ids)
-    if num_exterior_integrals > 0:
-        V.mesh.topology.create_entities(tdim - 1)
-        V.mesh.topology.create_connectivity(tdim - 1, tdim)
-        # Get facet permutations if required
-        facet_perms = numpy.array([], dtype=numpy.uint8)
-        if form._cpp_object.needs_facet_permutations:
-            facet_perms = V.mesh.topology.get_facet_permutations()
-        perm = (cell_perms, form._cpp_object.needs_facet_permutations, facet_perms)
-        # NOTE: This depends on enum ordering in ufcx.h
-        ext_facet_pos = ufcx_form.form_integral_offsets[1]
-        for i, id in enumerate(subdomain_ids):
-            facet_kernel = getattr(ufcx_form.form_integrals[ext_facet_pos + i], f"tabulate_tensor_{nptype}")
-            coeffs_i = form_coeffs[(_fem.IntegralType.exterior_facet, id)]
-            facets = form._cpp_object.domains(_fem.IntegralType.exterior_facet, id)
-            facet_info = pack_slave_facet_info(facets, slave_cells)
+        # Assemble exterior facet integrals
+        subdomain_ids = form._cpp_object.integral_ids(_fem.IntegralType.exterior_facet)
+        num_exterior_integrals = len(subdomain_ids)
+        if num_exterior_integrals > 0:
+            V.mesh.topology.create_entities(tdim - 1)
+            V.mesh.topology.create_connectivity(tdim - 1, tdim)
+            # Get facet permutations if required
+            facet_perms = numpy.array([], dtype=numpy.uint8)
+            if form._cpp_object.needs_facet_permutations:
+                facet_perms = V.mesh.topology.get_facet_permutations()
+            perm = (cell_perms, form._cpp_object.needs_facet_permutations, facet_perms)
             num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
-            with vector.localForm() as b:
+            # NOTE: This depends on enum ordering in ufcx.h
+            ext_facet_pos = ufcx_form.form_integral_offsets[1]
+            for i, id in enumerate(subdomain_ids):
+                facet_kernel = getattr(ufcx_form.form_integrals[ext_facet_pos + i], _tabulate_tensor)
+                coeffs_i = form_coeffs[(_fem.IntegralType.exterior_facet, id)]
+                facets = form._cpp_object.domains(_fem.IntegralType.exterior_facet, id)
+                facet_info = pack_slave_facet_info(facets, is_slave_cell)
                 assemble_exterior_slave_facets(
-                    numpy.asarray(b),
+                    b,
                     facet_kernel,
                     facet_info,
                     (x_dofs, x),
                     coeffs_i,
                     form_consts,
                     perm,
-                    dofs,
                     block_size,
                     num_dofs_per_element,
                     mpc_data,
@@ -170,7 +158,7 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     return vector
 
 
-@numba.njit
+@numba.njit(fastmath=True, cache=True)
 def assemble_cells(
     b: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     kernel: cffi.FFI.CData,
@@ -178,8 +166,6 @@ def assemble_cells(
     mesh: Tuple[npt.NDArray[numpy.int32], npt.NDArray[dolfinx.default_real_type]],
     coeffs: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     constants: npt.NDArray[_PETSc.ScalarType],  # type: ignore
-    permutation_info: npt.NDArray[numpy.uint32],
-    dofmap: npt.NDArray[numpy.int32],
     block_size: int,
     num_dofs_per_element: int,
     mpc: Tuple[  # type: ignore
@@ -201,36 +187,44 @@ def assemble_cells(
     # Unpack mesh data
     x_dofmap, x = mesh
 
-    # NOTE: All cells are assumed to be of the same typecd
-    geometry = numpy.zeros((x_dofmap.shape[1], 3), dtype=dolfinx.default_real_type)
+    # NOTE: All cells are assumed to be of the same type
+    num_xdofs_per_cell = x_dofmap.shape[1]
+    geometry = numpy.zeros((num_xdofs_per_cell, 3), dtype=dolfinx.default_real_type)
     b_local = numpy.zeros(block_size * num_dofs_per_element, dtype=_PETSc.ScalarType)  # type: ignore
+    b_local_copy = numpy.zeros(block_size * num_dofs_per_element, dtype=_PETSc.ScalarType)  # type: ignore
+
+    # Pointers to buffers that are reused for every cell
+    b_local_p = ffi_fb(b_local)
+    constants_p = ffi_fb(constants)
+    geometry_p = ffi_fb(geometry)
+    facet_index_p = ffi_fb(facet_index)
+    facet_perm_p = ffi_fb(facet_perm)
 
     for cell_index in active_cells:
-        # Compute mesh geometry for cell
-        geometry[:, :] = x[x_dofmap[cell_index]]
+        # Compute mesh geometry for cell (row-wise copy avoids a temporary from fancy indexing)
+        for j in range(num_xdofs_per_cell):
+            geometry[j] = x[x_dofmap[cell_index, j]]
 
         # Assemble local element vector
         b_local.fill(0.0)
         kernel(
-            ffi_fb(b_local),  # type: ignore
+            b_local_p,  # type: ignore
             ffi_fb(coeffs[cell_index, :]),  # type: ignore
-            ffi_fb(constants),  # type: ignore
-            ffi_fb(geometry),  # type: ignore
-            ffi_fb(facet_index),  # type: ignore
-            ffi_fb(facet_perm),  # type: ignore
+            constants_p,  # type: ignore
+            geometry_p,  # type: ignore
+            facet_index_p,  # type: ignore
+            facet_perm_p,  # type: ignore
         )
         # NOTE: Here we need to add the apply_dof_transformation function
 
         # Modify global vector and local cell contributions
-        b_local_copy = b_local.copy()
-        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc, dofmap, block_size, num_dofs_per_element)
-        for j in range(num_dofs_per_element):
-            for k in range(block_size):
-                position = dofmap[cell_index, j] * block_size + k
-                b[position] += b_local[j * block_size + k] - b_local_copy[j * block_size + k]
+        b_local_copy[:] = b_local
+        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc)
+
+    sink(b_local, constants, geometry, facet_index, facet_perm)
 
 
-@numba.njit
+@numba.njit(fastmath=True, cache=True)
 def assemble_exterior_slave_facets(
     b: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     kernel: cffi.FFI.CData,
@@ -239,7 +233,6 @@ def assemble_exterior_slave_facets(
     coeffs: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     constants: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     permutation_info: npt.NDArray[numpy.uint32],
-    dofmap: npt.NDArray[numpy.int32],
     block_size: int,
     num_dofs_per_element: int,
     mpc: Tuple[  # type: ignore
@@ -263,40 +256,49 @@ def assemble_exterior_slave_facets(
     # Unpack mesh data
     x_dofmap, x = mesh
 
-    geometry = numpy.zeros((x_dofmap.shape[1], 3), dtype=x.dtype)
+    num_xdofs_per_cell = x_dofmap.shape[1]
+    geometry = numpy.zeros((num_xdofs_per_cell, 3), dtype=x.dtype)
     b_local = numpy.zeros(block_size * num_dofs_per_element, dtype=_PETSc.ScalarType)  # type: ignore
+    b_local_copy = numpy.zeros(block_size * num_dofs_per_element, dtype=_PETSc.ScalarType)  # type: ignore
+
+    # Pointers to buffers that are reused for every facet
+    b_local_p = ffi_fb(b_local)
+    constants_p = ffi_fb(constants)
+    geometry_p = ffi_fb(geometry)
+    facet_index_p = ffi_fb(facet_index)
+    facet_perm_p = ffi_fb(facet_perm)
+
     for i in range(facet_info.shape[0]):
         # Extract cell index (local to process) and facet index (local to cell) for kernel
         cell_index, local_facet = facet_info[i]
         facet_index[0] = local_facet
 
         # Extract cell geometry
-        geometry[:, :] = x[x_dofmap[cell_index]]
+        for j in range(num_xdofs_per_cell):
+            geometry[j] = x[x_dofmap[cell_index, j]]
 
         # Compute local facet kernel
         if needs_facet_perm:
             facet_perm[0] = facet_perms[cell_index * num_facets_per_cell + local_facet]
         b_local.fill(0.0)
         kernel(
-            ffi_fb(b_local),  # type: ignore
+            b_local_p,  # type: ignore
             ffi_fb(coeffs[cell_index, :]),  # type: ignore
-            ffi_fb(constants),  # type: ignore
-            ffi_fb(geometry),  # type: ignore
-            ffi_fb(facet_index),  # type: ignore
-            ffi_fb(facet_perm),  # type: ignore
+            constants_p,  # type: ignore
+            geometry_p,  # type: ignore
+            facet_index_p,  # type: ignore
+            facet_perm_p,  # type: ignore
         )
         # NOTE: Here we need to add the apply_dof_transformation
 
         # Modify local contributions and add global MPC contributions
-        b_local_copy = b_local.copy()
-        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc, dofmap, block_size, num_dofs_per_element)
-        for j in range(num_dofs_per_element):
-            for k in range(block_size):
-                position = dofmap[cell_index, j] * block_size + k
-                b[position] += b_local[j * block_size + k] - b_local_copy[j * block_size + k]
+        b_local_copy[:] = b_local
+        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc)
 
+    sink(b_local, constants, geometry, facet_index, facet_perm)
 
-@numba.njit(cache=True)
+
+@numba.njit(fastmath=True, cache=True)
 def modify_mpc_contributions(
     b: npt.NDArray[_PETSc.ScalarType],  # type: ignore
     cell_index: int,  # type: ignore
@@ -310,37 +312,29 @@ def modify_mpc_contributions(
         npt.NDArray[numpy.int32],
         npt.NDArray[numpy.int32],
     ],
-    dofmap: npt.NDArray[numpy.int32],
-    block_size: int,
-    num_dofs_per_element: int,
 ):
     """
     Modify local entries of b_local with MPC info and add modified
-    entries to global vector b.
+    entries to global vector b. As only the slave entries of b_local are
+    modified, the difference to b_copy is scattered for those entries only.
     """
 
     # Unwrap MPC data
-    masters, coefficients, offsets, cell_to_slave, cell_to_slave_offset, is_slave = mpc
+    masters, coefficients, offsets, cell_to_slave, cell_to_slave_offset, local_slave_index = mpc
 
-    # Determine which slaves are in this cell,
-    # and which global index they have in 1D arrays
+    # Determine which slaves are in this cell, and their
+    # position in the local element vector
     cell_slaves = cell_to_slave[cell_to_slave_offset[cell_index] : cell_to_slave_offset[cell_index + 1]]
-
-    # Get local index of slaves in cell
-    cell_blocks = dofmap[cell_index]
-    local_index = numpy.empty(len(cell_slaves), dtype=numpy.int32)
-    for i in range(num_dofs_per_element):
-        for j in range(block_size):
-            dof = cell_blocks[i] * block_size + j
-            if is_slave[dof]:
-                location = numpy.flatnonzero(cell_slaves == dof)[0]
-                local_index[location] = i * block_size + j
+    local_index = local_slave_index[cell_to_slave_offset[cell_index] : cell_to_slave_offset[cell_index + 1]]
 
     # Move contribution from each slave to the corresponding master dof
-    # and zero out local b
+    # and zero out local b. NOTE: Masters are stored with process local
+    # indices (including ghosts), so no global to local lookup is needed
     for local, slave in zip(local_index, cell_slaves):
         cell_masters = masters[offsets[slave] : offsets[slave + 1]]
         cell_coeffs = coefficients[offsets[slave] : offsets[slave + 1]]
         for m0, c0 in zip(cell_masters, cell_coeffs):
             b[m0] += c0 * b_copy[local]
+        if len(cell_masters) > 0:
             b_local[local] = 0
+        b[slave] += b_local[local] - b_copy[local]
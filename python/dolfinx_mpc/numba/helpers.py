@@ -7,6 +7,8 @@ from __future__ import annotations
 
 from typing import Union
 
+from petsc4py import PETSc as _PETSc
+
 import dolfinx.cpp as _cpp
 import numpy
 import numpy.typing as npt
@@ -21,23 +23,52 @@ _bcs = Union[
     _cpp.fem.DirichletBC_complex128,
 ]
 
+# Name of the UFCx kernel matching the PETSc scalar type. The scalar type is fixed
+# for the lifetime of the process, so it is resolved once at import.
+if numpy.dtype(_PETSc.ScalarType).name not in ("float32", "float64", "complex64", "complex128"):  # type: ignore
+    raise RuntimeError(f"Unsupported scalar type {_PETSc.ScalarType}.")  # type: ignore
+_tabulate_tensor = f"tabulate_tensor_{numpy.dtype(_PETSc.ScalarType).name}"  # type: ignore
+
 
 @numba.njit(fastmath=True, cache=True)
-def extract_slave_cells(cell_offset: npt.NDArray[numpy.int32]) -> npt.NDArray[numpy.int32]:
-    """From an offset determine which entries are nonzero"""
-    slave_cells = numpy.zeros(len(cell_offset) - 1, dtype=numpy.int32)
-    c = 0
+def slave_cell_indicator(cell_offset: npt.NDArray[numpy.int32], num_cells: int) -> npt.NDArray[numpy.bool_]:
+    """From an offset create a marker array of length `num_cells` indicating which cells contain slaves"""
+    is_slave_cell = numpy.zeros(num_cells, dtype=numpy.bool_)
     for cell in range(len(cell_offset) - 1):
-        num_cells = cell_offset[cell + 1] - cell_offset[cell]
-        if num_cells > 0:
-            slave_cells[c] = cell
-            c += 1
-    return slave_cells[:c]
+        is_slave_cell[cell] = cell_offset[cell + 1] > cell_offset[cell]
+    return is_slave_cell
+
+
+@numba.njit(fastmath=True, cache=True)
+def compute_local_slave_index(
+    cell_to_slave: npt.NDArray[numpy.int32],
+    cell_to_slave_offset: npt.NDArray[numpy.int32],
+    dofmap: npt.NDArray[numpy.int32],
+    block_size: int,
+) -> npt.NDArray[numpy.int32]:
+    """
+    For each slave in the cell to slave map, compute the position of the slave in the
+    local (blocked) element tensor of the cell. The output has the same layout as `cell_to_slave`
+    """
+    local_index = numpy.empty(len(cell_to_slave), dtype=numpy.int32)
+    for cell in range(len(cell_to_slave_offset) - 1):
+        start = cell_to_slave_offset[cell]
+        end = cell_to_slave_offset[cell + 1]
+        if start == end:
+            continue
+        for i in range(dofmap.shape[1]):
+            for j in range(block_size):
+                dof = dofmap[cell, i] * block_size + j
+                for k in range(start, end):
+                    if cell_to_slave[k] == dof:
+                        local_index[k] = i * block_size + j
+                        break
+    return local_index
 
 
 @numba.njit(fastmath=True, cache=True)
 def pack_slave_facet_info(
-    facets: npt.NDArray[numpy.int32], slave_cells: npt.NDArray[numpy.int32]
+    facets: npt.NDArray[numpy.int32], is_slave_cell: npt.NDArray[numpy.bool_]
 ) -> npt.NDArray[numpy.int32]:
     """
     Given an MPC and a set of facets (cell index, local_facet_index),
@@ -46,7 +77,8 @@ def pack_slave_facet_info(
     facet_info = numpy.zeros((len(facets), 2), dtype=numpy.int32)
     i = 0
     for facet in facets:
-        if sum(slave_cells == facet[0]) > 0:
-            facet_info[i, :] = [facet[0], facet[1]]
+        if is_slave_cell[facet[0]]:
+            facet_info[i, 0] = facet[0]
+            facet_info[i, 1] = facet[1]
             i += 1
     return facet_info[:i, :]
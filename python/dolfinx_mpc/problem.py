@@ -138,9 +138,7 @@ class LinearProblem(dolfinx.fem.petsc.LinearProblem):
         self._A.assemble()
         assert self._A.assembled
 
-        # Assemble rhs
-        with self._b.localForm() as b_loc:
-            b_loc.set(0)
+        # Assemble rhs (assemble_vector zeroes the local form of b before assembly)
         assemble_vector(self._L, self._mpc, b=self._b)
 
         # Apply boundary conditions to the rhs